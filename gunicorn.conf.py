@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration
+
+The service is I/O bound (every request waits on PostgreSQL), so it runs
+on gevent workers that multiplex many in-flight requests per process.
+Gunicorn loads this file automatically from the working directory.
+"""
+import os
+
+worker_class = "gevent"
+# Each gevent worker already multiplexes requests, so a few processes are
+# enough. Every worker opens its own database pool (see service/config.py),
+# so raising this also raises the connection budget of each replica.
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Make psycopg2 cooperative so database waits yield to other greenlets"""
+    # pylint: disable=import-outside-toplevel
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
@@ -8,14 +8,18 @@ import sys
 from flask import Flask
 from service import config
 from service.common import log_handlers
+from service.common.cache import cache
 from flask_talisman import Talisman
 from flask_cors import CORS
 
 # Create Flask application
 app = Flask(__name__)
+# Serve /accounts/ and /accounts alike instead of answering with a redirect
+app.url_map.strict_slashes = False
 talisman = Talisman(app)
 CORS(app)
 app.config.from_object(config)
+cache.init_app(app)
 
 # Import the routes After the Flask app is created
 # pylint: disable=wrong-import-position, cyclic-import, wrong-import-order
@@ -24,6 +28,9 @@ from service import routes, models  # noqa: F401 E402
 # pylint: disable=wrong-import-position
 from service.common import error_handlers, cli_commands  # noqa: F401 E402
 
+# Prepare the URL map now instead of on the first request after startup
+app.url_map.update()
+
 # Set up logging for production
 log_handlers.init_logging(app, "gunicorn.error")
 
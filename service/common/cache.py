@@ -0,0 +1,77 @@
+"""
+Account Cache
+
+This module contains a Redis read-through cache for serialized accounts.
+Caching is disabled unless REDIS_URL is configured, so the service and its
+tests run without Redis.
+"""
+import logging
+import redis
+
+logger = logging.getLogger("flask.app")
+
+
+class AccountCache:
+    """Caches serialized accounts in Redis under accounts:{id} keys"""
+
+    def __init__(self, app=None):
+        self.client = None
+        self.ttl = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Connects to Redis when REDIS_URL is configured"""
+        url = app.config.get("REDIS_URL")
+        if not url:
+            logger.info("Redis cache disabled")
+            self.client = None
+            return
+        # short timeouts so an unreachable or saturated Redis raises RedisError
+        # and the request falls back to the database instead of hanging
+        pool = redis.BlockingConnectionPool.from_url(
+            url,
+            max_connections=app.config.get("REDIS_MAX_CONNECTIONS", 50),
+            timeout=app.config.get("REDIS_POOL_TIMEOUT", 0.1),
+            socket_timeout=app.config.get("REDIS_SOCKET_TIMEOUT", 0.25),
+            socket_connect_timeout=app.config.get("REDIS_CONNECT_TIMEOUT", 0.25),
+        )
+        self.client = redis.Redis(connection_pool=pool)
+        self.ttl = app.config.get("REDIS_TTL", 60)
+        logger.info("Redis cache enabled")
+
+    @staticmethod
+    def key(account_id):
+        """Returns the cache key for an account"""
+        return f"accounts:{account_id}"
+
+    def get(self, account_id):
+        """Returns the cached body for an account, or None on a miss"""
+        if self.client is None:
+            return None
+        try:
+            return self.client.get(self.key(account_id))
+        except redis.RedisError as error:
+            logger.warning("Cache read failed: %s", error)
+            return None
+
+    def set(self, account_id, body):
+        """Caches the serialized body of an account"""
+        if self.client is None:
+            return
+        try:
+            self.client.set(self.key(account_id), body, ex=self.ttl)
+        except redis.RedisError as error:
+            logger.warning("Cache write failed: %s", error)
+
+    def delete(self, account_id):
+        """Invalidates the cached body of an account"""
+        if self.client is None:
+            return
+        try:
+            self.client.delete(self.key(account_id))
+        except redis.RedisError as error:
+            logger.warning("Cache invalidation failed: %s", error)
+
+
+cache = AccountCache()
@@ -19,5 +19,35 @@ if not DATABASE_URI:
 SQLALCHEMY_DATABASE_URI = DATABASE_URI
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# Size the connection pool explicitly instead of relying on the defaults.
+# Every gunicorn worker process owns one pool, so the service can open up to
+#   replicas x GUNICORN_WORKERS x (DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW)
+# connections, which must stay below PostgreSQL's max_connections (100 by
+# default). The defaults give 3 x 2 x (5 + 5) = 60 for deploy/deployment.yaml;
+# shrink the pool when adding replicas or workers.
+if DATABASE_URI.startswith("postgresql"):
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.getenv("DATABASE_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DATABASE_MAX_OVERFLOW", "5")),
+        "pool_recycle": 3600,
+        "pool_pre_ping": True,
+        "pool_timeout": 30,
+        "connect_args": {
+            "options": f"-c statement_timeout={os.getenv('DATABASE_STATEMENT_TIMEOUT', '5000')}"
+        },
+    }
+
+# Redis read-through cache for accounts (disabled when REDIS_URL is not set)
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_TTL = int(os.getenv("REDIS_TTL", "60"))
+# Timeouts in seconds for Redis pool checkout, socket reads and connects
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "0.1"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.25"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.25"))
+
+# Largest request body accepted, in bytes (larger bodies get 413)
+MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(64 * 1024)))
+
 # Secret for session management
 SECRET_KEY = os.getenv("SECRET_KEY", "s3cr3t-key-shhhh")
@@ -6,6 +6,7 @@ All of the models are stored in this module
 import logging
 from datetime import date
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import delete, select, update
 
 logger = logging.getLogger("flask.app")
 
@@ -69,11 +70,74 @@ class PersistentBase:
         logger.info("Processing all records")
         return cls.query.all()
 
+    @classmethod
+    def serialized_page(cls, page, per_page):
+        """Returns one page of records as plain dictionaries ordered by id
+
+        The columns are selected with SQLAlchemy Core, so no ORM instances
+        are built. Dates are left as date objects for the JSON encoder.
+
+        Args:
+            page (int): the 1-based page number to return
+            per_page (int): the maximum number of records on a page
+        """
+        logger.info("Processing serialized page %s of %s records", page, per_page)
+        stmt = (
+            select(*cls.__table__.columns)
+            .order_by(cls.id)
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        return [dict(row) for row in db.session.execute(stmt).mappings()]
+
     @classmethod
     def find(cls, by_id):
         """Finds a record by it's ID"""
         logger.info("Processing lookup for id %s ...", by_id)
-        return cls.query.get(by_id)
+        return db.session.get(cls, by_id)
+
+    @classmethod
+    def update_by_id(cls, by_id, data):
+        """Updates a record with a single UPDATE ... RETURNING statement
+
+        Args:
+            by_id (int): the id of the record to update
+            data (dict): the new resource data, as accepted by deserialize()
+
+        Returns the updated record, or None if there is no record with that id
+        """
+        logger.info("Processing update for id %s ...", by_id)
+        changes = cls().deserialize(data)
+        table = cls.__table__
+        values = {
+            column.name: getattr(changes, column.name)
+            for column in table.columns
+            if not column.primary_key
+        }
+        stmt = update(table).where(table.c.id == by_id).values(**values)
+        if not db.engine.dialect.full_returning:
+            # dialects without UPDATE ... RETURNING need a second round-trip
+            found = db.session.execute(stmt).rowcount
+            db.session.commit()
+            return cls.find(by_id) if found else None
+        row = db.session.execute(stmt.returning(*table.columns)).first()
+        db.session.commit()
+        return cls(**row._mapping) if row else None
+
+    @classmethod
+    def delete_by_id(cls, by_id):
+        """Deletes a record with a single DELETE statement
+
+        Args:
+            by_id (int): the id of the record to delete
+
+        Returns the number of records deleted
+        """
+        logger.info("Processing delete for id %s ...", by_id)
+        table = cls.__table__
+        count = db.session.execute(delete(table).where(table.c.id == by_id)).rowcount
+        db.session.commit()
+        return count
 
 
 ######################################################################
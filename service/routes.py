@@ -3,20 +3,53 @@ Account Service
 
 This microservice handles the lifecycle of Accounts
 """
+import hashlib
+import orjson
 # pylint: disable=unused-import
-from flask import jsonify, request, make_response, abort, url_for   # noqa; F401
-from service.models import Account
+from flask import jsonify, request, make_response, abort, url_for, Response   # noqa; F401
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from service.models import Account, db
 from service.common import status  # HTTP Status Codes
+from service.common.cache import cache
 from . import app  # Import Flask application
 
+# Page size used by list_accounts when the client does not ask for one
+DEFAULT_PER_PAGE = 50
+# Upper bound on the page size a client may request
+MAX_PER_PAGE = 250
+# Largest OFFSET the database accepts (a signed 64-bit integer)
+MAX_OFFSET = 2**63 - 1
+
+# Bodies of the static endpoints, serialized once at import time
+_HEALTH_BODY = b'{"status":"OK"}'
+_INDEX_BODY = b'{"name":"Account REST API Service","version":"1.0"}'
+
 
 ############################################################
 # Health Endpoint
 ############################################################
-@app.route("/health")
+@app.route("/health", methods=["GET", "HEAD"])
 def health():
     """Health Status"""
-    return jsonify(dict(status="OK")), status.HTTP_200_OK
+    # liveness only: a database outage must not restart every replica at once
+    return Response(_HEALTH_BODY, status=status.HTTP_200_OK, mimetype="application/json")
+
+
+############################################################
+# Readiness Endpoint
+############################################################
+@app.route("/ready", methods=["GET", "HEAD"])
+def ready():
+    """Readiness Status"""
+    # ping the database so a starved or broken pool takes the pod out of service
+    try:
+        db.session.execute(text("SELECT 1"))
+    except SQLAlchemyError as error:
+        db.session.rollback()
+        app.logger.error("Database ping failed: %s", error)
+        return jsonify(dict(status="DOWN")), status.HTTP_503_SERVICE_UNAVAILABLE
+    return Response(_HEALTH_BODY, status=status.HTTP_200_OK, mimetype="application/json")
 
 
 ######################################################################
@@ -25,14 +58,7 @@ def health():
 @app.route("/")
 def index():
     """Root URL response"""
-    return (
-        jsonify(
-            name="Account REST API Service",
-            version="1.0",
-            # paths=url_for("list_accounts", _external=True),
-        ),
-        status.HTTP_200_OK,
-    )
+    return Response(_INDEX_BODY, status=status.HTTP_200_OK, mimetype="application/json")
 
 
 ######################################################################
@@ -47,14 +73,14 @@ def create_accounts():
     app.logger.info("Request to create an Account")
     check_content_type("application/json")
     account = Account()
-    account.deserialize(request.get_json())
+    account.deserialize(_request_json())
     account.create()
     message = account.serialize()
     # Uncomment once get_accounts has been implemented
     # location_url = url_for("get_accounts", account_id=account.id, _external=True)
     location_url = "/"  # Remove once get_accounts has been implemented
     return make_response(
-        jsonify(message), status.HTTP_201_CREATED, {"Location": location_url}
+        _json_response(message), status.HTTP_201_CREATED, {"Location": location_url}
     )
 
 ######################################################################
@@ -67,18 +93,31 @@ def create_accounts():
 @app.route("/accounts", methods=["GET"])
 def list_accounts():
     """ List accounts """
-    # use the Account.all() method to retrieve all accounts
-    account_list = Account.all()
-
-    # create a list of serialize() accounts
-    accounts_list = [account.serialize() for account in account_list]
+    # read the requested page, bounded so a single call never scans the table
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", DEFAULT_PER_PAGE, type=int)
+    if page < 1 or per_page < 1:
+        abort(status.HTTP_400_BAD_REQUEST, "page and per_page must be positive integers")
+    per_page = min(per_page, MAX_PER_PAGE)
+    if (page - 1) * per_page > MAX_OFFSET:
+        abort(status.HTTP_400_BAD_REQUEST, "page is out of range")
+
+    # use the Account.serialized_page() method to retrieve one page of accounts
+    accounts_list = Account.serialized_page(page, per_page)
 
     # log the number of accounts being returned in the list
     num_accounts = len(accounts_list)
-    app.logger.info(f"returning {num_accounts} accounts in list.")
-
-    # return the list with a return code of status.HTTP_200_O
-    return jsonify(accounts_list), status.HTTP_200_OK
+    app.logger.info("returning %d accounts in list.", num_accounts)
+
+    # return the list with a return code of status.HTTP_200_OK
+    # the body is buffered rather than streamed: a page holds at most
+    # MAX_PER_PAGE rows, and both the ETag and the Link header need the
+    # whole page before the first byte is sent
+    headers = {}
+    links = _page_links(page, per_page, num_accounts)
+    if links:
+        headers["Link"] = links
+    return _etagged(make_response(_json_response(accounts_list), status.HTTP_200_OK, headers))
 
 ######################################################################
 # READ AN ACCOUNT
@@ -91,15 +130,21 @@ def list_accounts():
 def get_accounts(account_id):
     """Reads one account"""
 
-    # use the Account.find() method to find the account
-    find_account = Account.find(account_id)
+    # serve the account straight from the cache when we can
+    body = cache.get(account_id)
+    if body is None:
+        # use the Account.find() method to find the account
+        find_account = Account.find(account_id)
 
-    # abort() with a status.HTTP_404_NOT_FOUND if it cannot be found
-    if not find_account:
-        abort(status.HTTP_404_NOT_FOUND, "Account was not found.")
+        # abort() with a status.HTTP_404_NOT_FOUND if it cannot be found
+        if not find_account:
+            abort(status.HTTP_404_NOT_FOUND, "Account was not found.")
+
+        body = orjson.dumps(find_account.serialize())
+        cache.set(account_id, body)
 
     # return the serialize() version of the account with a return code of status.HTTP_200_OK
-    return find_account.serialize(), status.HTTP_200_OK
+    return _etagged(make_response(Response(body, mimetype="application/json"), status.HTTP_200_OK))
 
 ######################################################################
 # UPDATE AN EXISTING ACCOUNT
@@ -112,21 +157,16 @@ def get_accounts(account_id):
 def update_accounts(account_id):
     """Update an account"""
 
-    # use the Account.find() method to retrieve the account by the account_id
-    find_account = Account.find(account_id)
+    # use the Account.update_by_id() method to update the account in one statement
+    account = Account.update_by_id(account_id, _request_json())
+    cache.delete(account_id)
 
     # abort() with a status.HTTP_404_NOT_FOUND if it cannot be found
-    if not find_account:
+    if not account:
         abort(status.HTTP_404_NOT_FOUND, "Account not found")
 
-    # call the deserialize() method on the account passing in request.get_json()
-    find_account.deserialize(request.get_json())
-
-    # call account.update() to update the account with the new data
-    find_account.update()
-
     # return the serialize() version of the account with a return code of status.HTTP_200_OK
-    return find_account.serialize(), status.HTTP_200_OK
+    return _json_response(account.serialize()), status.HTTP_200_OK
 
 ######################################################################
 # DELETE AN ACCOUNT
@@ -139,12 +179,9 @@ def update_accounts(account_id):
 def delete_accounts(account_id):
     """ Delete Account """
 
-    # use the Account.find() method to retrieve the account by the account_id
-    find_account = Account.find(account_id)
-
-    # if found, call the delete() method on the account
-    if find_account:
-        find_account.delete()
+    # use the Account.delete_by_id() method to delete the account in one statement
+    Account.delete_by_id(account_id)
+    cache.delete(account_id)
 
     # return and empty body ("") with a return code of status.HTTP_204_NO_CONTENT
     return "", status.HTTP_204_NO_CONTENT
@@ -156,11 +193,61 @@ def delete_accounts(account_id):
 
 def check_content_type(media_type):
     """Checks that the media type is correct"""
-    content_type = request.headers.get("Content-Type")
-    if content_type and content_type == media_type:
+    # request.mimetype drops parameters such as "; charset=utf-8"
+    if request.mimetype == media_type:
         return
-    app.logger.error("Invalid Content-Type: %s", content_type)
+    app.logger.error("Invalid Content-Type: %s", request.content_type)
     abort(
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
         f"Content-Type must be {media_type}",
     )
+
+
+def _page_links(page, per_page, count):
+    """Builds an RFC 8288 Link header value for the neighbouring pages"""
+    links = []
+    if count == per_page:
+        url = url_for("list_accounts", page=page + 1, per_page=per_page)
+        links.append(f'<{url}>; rel="next"')
+    if page > 1:
+        url = url_for("list_accounts", page=page - 1, per_page=per_page)
+        links.append(f'<{url}>; rel="prev"')
+    return ", ".join(links)
+
+
+def _request_json():
+    """Parses the JSON body once, without keeping it cached on the request"""
+    if not request.is_json:
+        request.on_json_loading_failed(None)
+    # Werkzeug only enforces MAX_CONTENT_LENGTH for form data, so check it here
+    max_length = request.max_content_length
+    if max_length is None:
+        data = request.get_data(cache=False)
+    else:
+        if (request.content_length or 0) > max_length:
+            abort(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        # chunked bodies carry no Content-Length, so never read past the limit
+        data = request.stream.read(max_length + 1)
+        if len(data) > max_length:
+            abort(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+    try:
+        payload = orjson.loads(data)
+    except orjson.JSONDecodeError as error:
+        request.on_json_loading_failed(error)
+    if payload is None:
+        abort(status.HTTP_400_BAD_REQUEST, "Request body must contain JSON data")
+    return payload
+
+
+def _json_response(payload):
+    """Encodes a payload with orjson, which is much faster than jsonify"""
+    return Response(orjson.dumps(payload), mimetype="application/json")
+
+
+def _etagged(response):
+    """Tags a response with a strong ETag and answers If-None-Match with 304"""
+    digest = hashlib.blake2b(response.get_data(), digest_size=16).hexdigest()
+    response.set_etag(digest)
+    response.cache_control.private = True
+    response.cache_control.max_age = 30
+    return response.make_conditional(request)
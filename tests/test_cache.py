@@ -0,0 +1,67 @@
+"""
+Test cases for the Account Cache
+"""
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+import redis
+from flask import Flask
+from service.common.cache import AccountCache
+
+
+class TestAccountCache(TestCase):
+    """Test Cases for AccountCache"""
+
+    def setUp(self):
+        self.cache = AccountCache()
+        self.cache.client = MagicMock()
+        self.cache.ttl = 60
+
+    def test_disabled_without_redis_url(self):
+        """It should disable caching when REDIS_URL is not set"""
+        app = Flask(__name__)
+        cache = AccountCache(app)
+        self.assertIsNone(cache.client)
+        self.assertIsNone(cache.get(1))
+        cache.set(1, b"{}")
+        cache.delete(1)
+
+    @patch("service.common.cache.redis.Redis")
+    def test_enabled_with_redis_url(self, redis_mock):
+        """It should connect to Redis when REDIS_URL is set"""
+        app = Flask(__name__)
+        app.config["REDIS_URL"] = "redis://localhost:6379/0"
+        cache = AccountCache(app)
+        self.assertEqual(cache.client, redis_mock.return_value)
+
+    @patch("service.common.cache.redis.BlockingConnectionPool.from_url")
+    def test_enabled_with_timeouts(self, from_url_mock):
+        """It should bound pool checkout, socket and connect times"""
+        app = Flask(__name__)
+        app.config["REDIS_URL"] = "redis://localhost:6379/0"
+        app.config["REDIS_POOL_TIMEOUT"] = 0.1
+        app.config["REDIS_SOCKET_TIMEOUT"] = 0.2
+        app.config["REDIS_CONNECT_TIMEOUT"] = 0.3
+        AccountCache(app)
+        kwargs = from_url_mock.call_args.kwargs
+        self.assertEqual(kwargs["timeout"], 0.1)
+        self.assertEqual(kwargs["socket_timeout"], 0.2)
+        self.assertEqual(kwargs["socket_connect_timeout"], 0.3)
+
+    def test_get_set_delete(self):
+        """It should read, write and invalidate accounts:{id} keys"""
+        self.cache.client.get.return_value = b'{"id":1}'
+        self.assertEqual(self.cache.get(1), b'{"id":1}')
+        self.cache.client.get.assert_called_once_with("accounts:1")
+        self.cache.set(1, b'{"id":1}')
+        self.cache.client.set.assert_called_once_with("accounts:1", b'{"id":1}', ex=60)
+        self.cache.delete(1)
+        self.cache.client.delete.assert_called_once_with("accounts:1")
+
+    def test_redis_errors_are_ignored(self):
+        """It should fall back to the database when Redis fails"""
+        self.cache.client.get.side_effect = redis.ConnectionError()
+        self.cache.client.set.side_effect = redis.ConnectionError()
+        self.cache.client.delete.side_effect = redis.ConnectionError()
+        self.assertIsNone(self.cache.get(1))
+        self.cache.set(1, b"{}")
+        self.cache.delete(1)
@@ -107,6 +107,27 @@ class TestAccount(unittest.TestCase):
         account = Account.find(account.id)
         self.assertEqual(account.email, "XYZZY@plugh.com")
 
+    def test_update_account_by_id(self):
+        """It should Update an account with a single statement"""
+        account = AccountFactory()
+        account.create()
+        data = account.serialize()
+        data["email"] = "XYZZY@plugh.com"
+        updated = Account.update_by_id(account.id, data)
+        self.assertEqual(updated.id, account.id)
+        self.assertEqual(updated.email, "XYZZY@plugh.com")
+        self.assertEqual(Account.find(account.id).email, "XYZZY@plugh.com")
+        self.assertIsNone(Account.update_by_id(0, data))
+
+    def test_delete_account_by_id(self):
+        """It should Delete an account with a single statement"""
+        account = AccountFactory()
+        account.create()
+        account_id = account.id
+        self.assertEqual(Account.delete_by_id(account_id), 1)
+        self.assertEqual(Account.all(), [])
+        self.assertEqual(Account.delete_by_id(account_id), 0)
+
     def test_delete_an_account(self):
         """It should Delete an account from the database"""
         accounts = Account.all()
@@ -132,6 +153,19 @@ class TestAccount(unittest.TestCase):
         accounts = Account.all()
         self.assertEqual(len(accounts), 5)
 
+    def test_serialized_page(self):
+        """It should List a page of Accounts as dictionaries"""
+        accounts = AccountFactory.create_batch(3)
+        for account in accounts:
+            account.create()
+        page = Account.serialized_page(1, 2)
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page[0]["id"], accounts[0].id)
+        self.assertEqual(page[0]["name"], accounts[0].name)
+        self.assertEqual(page[0]["date_joined"], accounts[0].date_joined)
+        self.assertEqual(set(page[0]), set(accounts[0].serialize()))
+        self.assertEqual(len(Account.serialized_page(2, 2)), 1)
+
     def test_find_by_name(self):
         """It should Find an Account by name"""
         account = AccountFactory()
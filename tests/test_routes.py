@@ -5,9 +5,15 @@ Test cases can be run with the following:
   nosetests -v --with-spec --spec-color
   coverage report -m
 """
+import io
+import json
 import os
 import logging
+from contextlib import contextmanager
 from unittest import TestCase
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
 from tests.factories import AccountFactory
 from service.common import status  # HTTP Status Codes
 from service.models import db, Account, init_db
@@ -39,28 +45,54 @@ class TestAccountService(TestCase):
         app.logger.setLevel(logging.CRITICAL)
         init_db(app)
         talisman.force_https = False
+        cls.client = app.test_client()
+
+        # run the whole suite inside one transaction that is never committed
+        cls.connection = db.engine.connect()
+        cls.trans = cls.connection.begin()
+        cls.connection.execute(Account.__table__.delete())  # start from an empty table
+        cls.session = db.session
+        db.session = db.create_scoped_session(
+            options={"bind": cls.connection, "binds": {}}
+        )
 
     @classmethod
     def tearDownClass(cls):
-        """Runs once before test suite"""
+        """Runs once after test suite"""
+        db.session.remove()
+        db.session = cls.session
+        cls.trans.rollback()
+        cls.connection.close()
 
     def setUp(self):
         """Runs before each test"""
-        db.session.query(Account).delete()  # clean up the last tests
-        db.session.commit()
-
-        self.client = app.test_client()
+        # each test runs in a SAVEPOINT that is rolled back in tearDown, and
+        # the session commits into an inner SAVEPOINT that is restarted after
+        # every commit so the service code can keep calling commit()
+        self.nested = self.connection.begin_nested()
+        self.savepoint = self.connection.begin_nested()
+        self.restart_savepoint = self._restart_savepoint
+        event.listen(db.session, "after_transaction_end", self.restart_savepoint)
 
     def tearDown(self):
         """Runs once after each test case"""
         db.session.remove()
+        event.remove(db.session, "after_transaction_end", self.restart_savepoint)
+        if self.savepoint.is_active:
+            self.savepoint.rollback()
+        self.nested.rollback()
+
+    def _restart_savepoint(self, session, transaction):  # pylint: disable=unused-argument
+        """Begins a new inner SAVEPOINT once the session has ended the last one"""
+        if transaction.parent is None and not self.savepoint.is_active:
+            self.savepoint = self.connection.begin_nested()
 
     ######################################################################
     #  H E L P E R   M E T H O D S
     ######################################################################
 
-    def _create_accounts(self, count):
-        """Factory method to create accounts in bulk"""
+    def _create_accounts_via_api(self, count):
+        """Factory method to create accounts through the POST endpoint"""
         accounts = []
         for _ in range(count):
             account = AccountFactory()
@@ -75,6 +107,30 @@ class TestAccountService(TestCase):
             accounts.append(account)
         return accounts
 
+    @contextmanager
+    def assert_query_count(self, max_count):
+        """Fails the test if the block runs more than max_count SQL statements"""
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+        self.assertLessEqual(
+            len(statements), max_count, "Query budget exceeded:\n" + "\n".join(statements)
+        )
+
+    def _seed_accounts(self, count):
+        """Factory method to insert accounts in bulk, bypassing the API"""
+        accounts = AccountFactory.create_batch(count, id=None)
+        db.session.bulk_save_objects(accounts, return_defaults=True)
+        db.session.commit()
+        return accounts
+
     ######################################################################
     #  A C C O U N T   T E S T   C A S E S
     ######################################################################
@@ -83,6 +139,9 @@ class TestAccountService(TestCase):
         """It should get 200_OK from the Home Page"""
         response = self.client.get("/")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(data["name"], "Account REST API Service")
+        self.assertEqual(data["version"], "1.0")
 
     def test_health(self):
         """It should be healthy"""
@@ -91,6 +150,35 @@ class TestAccountService(TestCase):
         data = resp.get_json()
         self.assertEqual(data["status"], "OK")
 
+    def test_health_head(self):
+        """It should answer a HEAD health probe without a body"""
+        resp = self.client.head("/health")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.get_data(), b"")
+
+    @patch("service.routes.db.session.execute")
+    def test_health_without_database(self, execute_mock):
+        """It should stay healthy without touching the database"""
+        execute_mock.side_effect = OperationalError("SELECT 1", {}, Exception("down"))
+        resp = self.client.get("/health")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        execute_mock.assert_not_called()
+
+    def test_ready(self):
+        """It should be ready when the database answers"""
+        resp = self.client.get("/ready")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.get_json()["status"], "OK")
+
+    @patch("service.routes.db.session.execute")
+    def test_ready_database_down(self, execute_mock):
+        """It should not be ready when the database cannot be reached"""
+        execute_mock.side_effect = OperationalError("SELECT 1", {}, Exception("down"))
+        resp = self.client.get("/ready")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        data = resp.get_json()
+        self.assertEqual(data["status"], "DOWN")
+
     def test_create_account(self):
         """It should Create a new Account"""
         account = AccountFactory()
@@ -118,6 +206,63 @@ class TestAccountService(TestCase):
         response = self.client.post(BASE_URL, json={"name": "not enough data"})
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_account_too_large(self):
+        """It should not Create an Account from an oversized body"""
+        account = AccountFactory().serialize()
+        account["address"] = "x" * (app.config["MAX_CONTENT_LENGTH"] + 1)
+        response = self.client.post(BASE_URL, json=account)
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(response.get_json()["error"], "Request Entity Too Large")
+
+    def test_create_account_too_large_chunked(self):
+        """It should not Create an Account from an oversized chunked body"""
+        account = AccountFactory().serialize()
+        account["address"] = "x" * (app.config["MAX_CONTENT_LENGTH"] + 1)
+        response = self.client.post(
+            BASE_URL,
+            input_stream=io.BytesIO(json.dumps(account).encode()),
+            content_type="application/json",
+            headers={"Transfer-Encoding": "chunked"},
+            environ_overrides={"wsgi.input_terminated": True},
+        )
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_create_account_chunked(self):
+        """It should Create an Account from a chunked body within the limit"""
+        account = AccountFactory().serialize()
+        response = self.client.post(
+            BASE_URL,
+            input_stream=io.BytesIO(json.dumps(account).encode()),
+            content_type="application/json",
+            headers={"Transfer-Encoding": "chunked"},
+            environ_overrides={"wsgi.input_terminated": True},
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_account_invalid_json(self):
+        """It should not Create an Account from a malformed JSON body"""
+        response = self.client.post(
+            BASE_URL, data="{not json", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_account_null_body(self):
+        """It should not Create an Account from a JSON null body"""
+        response = self.client.post(
+            BASE_URL, data="null", content_type="application/json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_account_with_charset(self):
+        """It should Create an Account when the media type has parameters"""
+        account = AccountFactory()
+        response = self.client.post(
+            BASE_URL,
+            json=account.serialize(),
+            content_type="application/json; charset=utf-8"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_unsupported_media_type(self):
         """It should not Create an Account when sending the wrong media type"""
         account = AccountFactory()
@@ -134,7 +279,7 @@ class TestAccountService(TestCase):
 
     def test_read_an_account(self):
         """Should read one account"""
-        account = self._create_accounts(1)[0]
+        account = self._create_accounts_via_api(1)[0]
 
         # make a call to self.client.post() to create the account
         response = self.client.get(
@@ -150,6 +295,41 @@ class TestAccountService(TestCase):
         # assert that data["name"] equals the account.name
         self.assertEqual(response_data["name"], account.name)
 
+    def test_read_an_account_not_modified(self):
+        """Should answer 304 when the account has not changed"""
+        account = self._seed_accounts(1)[0]
+        response = self.client.get(f"{BASE_URL}/{account.id}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        self.assertIn("private", response.headers.get("Cache-Control"))
+
+        response = self.client.get(
+            f"{BASE_URL}/{account.id}", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.get_data(), b"")
+
+        # a changed account gets a new tag
+        self.client.put(
+            f"{BASE_URL}/{account.id}",
+            json=dict(account.serialize(), name="Changed"),
+        )
+        response = self.client.get(
+            f"{BASE_URL}/{account.id}", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+
+    @patch("service.routes.cache")
+    def test_read_an_account_from_cache(self, cache_mock):
+        """Should read one account from the cache without touching the database"""
+        cache_mock.get.return_value = b'{"id":7,"name":"Cached"}'
+        response = self.client.get(f"{BASE_URL}/7")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get_json()["name"], "Cached")
+        cache_mock.set.assert_not_called()
+
     def test_get_account_not_found(self):
         """Should not read account that is not found"""
 
@@ -163,10 +343,13 @@ class TestAccountService(TestCase):
 
     def test_get_account_list(self):
         """Should get a list of accounts"""
-        self._create_accounts(5)
+        accounts = self._seed_accounts(5)
 
         # send a self.client.get() request to the BASE_URL
-        response = self.client.get(BASE_URL)
+        # listing must not grow into one query per account (N+1)
+        with self.assert_query_count(2) as statements:
+            response = self.client.get(BASE_URL)
+        self.assertGreater(len(statements), 0)
 
         # assert that the resp.status_code is status.HTTP_200_OK
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -176,6 +359,49 @@ class TestAccountService(TestCase):
 
         # assert that the len() of the data is 5 (the number of accounts you created)
         self.assertEqual(len(data_response), 5)
+        self.assertEqual(data_response[0], accounts[0].serialize())
+
+    def test_get_account_list_not_modified(self):
+        """Should answer 304 when the account list has not changed"""
+        self._seed_accounts(2)
+        response = self.client.get(BASE_URL)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_get_account_list_paged(self):
+        """Should get a list of accounts one page at a time"""
+        self._seed_accounts(5)
+
+        # ask for the first page of two accounts
+        response = self.client.get(f"{BASE_URL}?page=1&per_page=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 2)
+        self.assertIn('rel="next"', response.headers.get("Link"))
+        self.assertNotIn('rel="prev"', response.headers.get("Link"))
+
+        # the last page is short and has no next link
+        response = self.client.get(f"{BASE_URL}?page=3&per_page=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 1)
+        self.assertIn('rel="prev"', response.headers.get("Link"))
+        self.assertNotIn('rel="next"', response.headers.get("Link"))
+
+    def test_get_account_list_trailing_slash(self):
+        """Should list accounts without redirecting a trailing slash"""
+        response = self.client.get(f"{BASE_URL}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_get_account_list_bad_page(self):
+        """Should not list accounts with an invalid page"""
+        response = self.client.get(f"{BASE_URL}?page=0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_get_account_list_page_out_of_range(self):
+        """Should not list accounts with a page past the largest OFFSET"""
+        response = self.client.get(f"{BASE_URL}?page=99999999999999999999")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
     """Update Accounts"""
 
@@ -203,11 +429,17 @@ class TestAccountService(TestCase):
         # assert that the updated_account["name"] is equal to Super Sonic
         self.assertEqual(updated_account["name"], "Super Sonic")
 
+    def test_update_account_not_found(self):
+        """Should not update an account that is not found"""
+        account = AccountFactory()
+        response = self.client.put(f"{BASE_URL}/0", json=account.serialize())
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
     """Delete Account"""
 
     def test_delete_account(self):
         """Should Delete Account"""
-        create_account = self._create_accounts(1)[0]
+        create_account = self._seed_accounts(1)[0]
 
         # send a self.client.delete() request to the BASE_URL with an id of an account
         response = self.client.delete(f"{BASE_URL}/{create_account.id}")
@@ -215,6 +447,12 @@ class TestAccountService(TestCase):
         # assert that the resp.status_code is status.HTTP_204_NO_CONTENT
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+        # the account is gone, and deleting it again is still a 204
+        response = self.client.get(f"{BASE_URL}/{create_account.id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.delete(f"{BASE_URL}/{create_account.id}")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
     """Error Handler"""
 
     def test_method_not_allowed(self):